@@ -16,6 +16,7 @@ import csv
 import json
 import os
 import argparse
+import statistics
 from datetime import datetime
 
 SUBSECTOR_MAP = {
@@ -78,45 +79,56 @@ def fmt_mktcap(val):
     except:
         return "N/A"
 
-def median(vals):
-    clean = []
+def parse_column(vals):
+    # Parse a column to floats once; blanks and "NM"-style cells are dropped
+    out = []
     for v in vals:
         try:
-            clean.append(float(str(v).replace(",","")))
-        except:
+            out.append(float(v.replace(",","")))
+        except ValueError:
             pass
-    if not clean:
+    return out
+
+def median(vals):
+    # Upper median of pre-parsed floats, matching the old sorted-midpoint pick
+    if not vals:
         return None
-    clean.sort()
-    mid = len(clean) // 2
-    return clean[mid]
+    return statistics.median_high(vals)
 
-def process_file(filepath, name, sub):
-    rows = []
+def read_columns(filepath):
+    # Project only the COL_MAP columns, resolved once from the header row,
+    # and collect each one as a list rather than rebuilding a dict per row
+    cols, n_rows = {}, 0
     with open(filepath, newline='', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader, [])
+        wanted = [(i, COL_MAP[h.strip()]) for i, h in enumerate(header) if h.strip() in COL_MAP]
+        if not wanted:
+            return cols, n_rows
+        cols = {field: [] for _, field in wanted}
         for row in reader:
-            # Normalise column names
-            normed = {}
-            for k, v in row.items():
-                k_clean = k.strip()
-                if k_clean in COL_MAP:
-                    normed[COL_MAP[k_clean]] = v.strip()
-            if normed:
-                rows.append(normed)
-
-    if not rows:
+            if not row:
+                continue
+            n_rows += 1
+            for i, field in wanted:
+                if i < len(row):
+                    cols[field].append(row[i].strip())
+    return cols, n_rows
+
+def process_file(filepath, name, sub):
+    cols, n_rows = read_columns(filepath)
+
+    if not n_rows:
         print(f"  WARNING: No data rows in {filepath}")
         return None
 
+    nums = {field: parse_column(vals) for field, vals in cols.items()}
+
     # Aggregate: market-cap weighted median for multiples, simple median for pcts
     def med(field):
-        return median([r.get(field, "") for r in rows])
+        return median(nums.get(field, []))
 
-    mktcap_total = sum(
-        float(str(r.get("mktcap_raw","0")).replace(",",""))
-        for r in rows if r.get("mktcap_raw")
-    )
+    mktcap_total = sum(nums.get("mktcap_raw", []))
 
     pe_cur  = med("pe_current")
     pe_52w  = med("pe_52w")
@@ -153,7 +165,7 @@ def process_file(filepath, name, sub):
 
     return {
         "name":   name,
-        "sub":    f"{sub} · {len(rows)} cos",
+        "sub":    f"{sub} · {n_rows} cos",
         "mktcap": fmt_mktcap(mktcap_total),
         "pe":     f"{pe_cur:.1f}x" if pe_cur else "N/A",
         "data": {
@@ -181,7 +193,7 @@ def process_file(filepath, name, sub):
         "spark": [50, 50, 50, 50, 50, 50, 50],  # placeholder — real sparklines need price history
         "source": "capiq",
         "as_of":  datetime.now().strftime("%d %b %Y %H:%M"),
-        "n_companies": len(rows),
+        "n_companies": n_rows,
     }
 
 def main():
@@ -4,14 +4,21 @@ Pulls: commodity prices, EIA grid status, RSS news feeds, official commentary
 Outputs: data/live.json (read by the dashboard)
 """
 
+import hashlib
+import http.client
 import json
 import os
 import re
+import threading
 import time
-import urllib.request
+import urllib.error
 import urllib.parse
+import urllib.request
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 
 # ── CONFIG ──────────────────────────────────────────────────────────────────
 with open("config.json") as f:
@@ -21,24 +28,178 @@ AV_KEY  = cfg["alpha_vantage_key"]
 EIA_KEY = cfg["eia_key"]
 
 # ── HELPERS ──────────────────────────────────────────────────────────────────
-def fetch(url, timeout=15):
+# Feeds and API calls are I/O-bound and hit distinct hosts, so they are
+# fetched concurrently rather than one after another
+FETCH_WORKERS = 8
+
+USER_AGENT = "GRID-Monitor/1.0"
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Idle keep-alive connections, keyed by (scheme, host). Repeat calls to the
+# same host (8× api.eia.gov, 6× alphavantage.co) skip the TCP + TLS handshake.
+_idle_conns = {}
+_idle_lock = threading.Lock()
+
+def checkout_conn(scheme, host, timeout):
+    with _idle_lock:
+        pool = _idle_conns.get((scheme, host))
+        if pool:
+            return pool.pop()
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    return cls(host, timeout=timeout)
+
+def checkin_conn(scheme, host, conn):
+    with _idle_lock:
+        _idle_conns.setdefault((scheme, host), []).append(conn)
+
+# http.client knows nothing about HTTP(S)_PROXY / NO_PROXY, so proxied hosts
+# go through urllib instead (no connection pooling on that path)
+PROXIES = urllib.request.getproxies()
+
+def proxied_get(url, timeout, headers):
+    req = urllib.request.Request(url, headers=headers)
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "GRID-Monitor/1.0"})
         with urllib.request.urlopen(req, timeout=timeout) as r:
-            return r.read().decode("utf-8")
+            return r.status, r.headers, r.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+def http_get(url, timeout=15, headers=None, redirects=5):
+    """GET over a pooled connection. Returns (status, headers, body bytes)."""
+    headers = {"User-Agent": USER_AGENT, **(headers or {})}
+    parts = urllib.parse.urlsplit(url)
+    if PROXIES.get(parts.scheme) and not urllib.request.proxy_bypass(parts.hostname):
+        return proxied_get(url, timeout, headers)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    conn = checkout_conn(parts.scheme, parts.netloc, timeout)
+    try:
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        except ConnectionError:
+            # Server dropped the idle socket — http.client reopens it on retry
+            conn.close()
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        body = resp.read()
+    except Exception:
+        conn.close()
+        raise
+    checkin_conn(parts.scheme, parts.netloc, conn)
+
+    location = resp.getheader("Location")
+    if resp.status in REDIRECT_CODES and location and redirects > 0:
+        return http_get(urllib.parse.urljoin(url, location), timeout, headers, redirects - 1)
+    return resp.status, resp.headers, body
+
+# On-disk response cache, persisted between cron runs. Entries younger than
+# the TTL are served without a request; older ones are revalidated with
+# If-None-Match / If-Modified-Since so unchanged feeds come back as a 304.
+HTTP_CACHE_DIR = "data/.http_cache"
+HTTP_CACHE_TTL = 300  # seconds — well under the 15-min cron, whose runs start late by varying amounts
+
+def cache_path(url):
+    return os.path.join(HTTP_CACHE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+def load_cached(url):
+    try:
+        with open(cache_path(url)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def store_cached(url, entry):
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    path = cache_path(url)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+
+def evict_cached(url):
+    try:
+        os.remove(cache_path(url))
+    except OSError:
+        pass
+
+# Minimum spacing between request starts for hosts that throttle bursts. The
+# free AV key answers faster than ~1 request/second with an "Information" note
+# instead of a quote. Only real network requests are paced, never cache hits.
+HOST_MIN_INTERVAL = {"www.alphavantage.co": 1.0}  # seconds
+_pace_lock = threading.Lock()
+_next_start = {}
+
+def pace_host(host):
+    interval = HOST_MIN_INTERVAL.get(host)
+    if not interval:
+        return
+    with _pace_lock:
+        wait = _next_start.get(host, 0.0) - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _next_start[host] = time.monotonic() + interval
+
+def fetch(url, timeout=15):
+    cached = load_cached(url)
+    if cached and time.time() - cached["fetched_at"] < HTTP_CACHE_TTL:
+        return cached["body"]
+
+    conditional = {}
+    if cached and cached.get("etag"):
+        conditional["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        conditional["If-Modified-Since"] = cached["last_modified"]
+
+    pace_host(urllib.parse.urlsplit(url).hostname)
+    try:
+        status, headers, body = http_get(url, timeout, conditional)
+        if status == 304 and cached:
+            text = cached["body"]
+        elif status >= 400:
+            raise http.client.HTTPException(f"HTTP {status}")
+        else:
+            text = body.decode("utf-8")
     except Exception as e:
         print(f"  FETCH ERROR {url[:60]}: {e}")
         return None
 
+    # The cache is only an optimisation — never lose a good response to it
+    try:
+        store_cached(url, {
+            "fetched_at":    time.time(),
+            "etag":          headers.get("ETag") or (cached or {}).get("etag"),
+            "last_modified": headers.get("Last-Modified") or (cached or {}).get("last_modified"),
+            "body":          text,
+        })
+    except OSError as e:
+        print(f"  CACHE WRITE ERROR {url[:60]}: {e}")
+    return text
+
+# AV reports throttling and bad requests as HTTP 200 with one of these keys
+API_ERROR_KEYS = ("Note", "Information", "Error Message")
+
 def fetch_json(url):
     raw = fetch(url)
     if raw:
         try:
-            return json.loads(raw)
-        except:
+            data = json.loads(raw)
+        except ValueError:
+            evict_cached(url)
             return None
+        # Don't let a throttle note be re-served from cache as if it were data
+        if isinstance(data, dict) and any(k in data for k in API_ERROR_KEYS):
+            evict_cached(url)
+        return data
     return None
 
+def keyword_re(words):
+    # One compiled alternation per rule table: a single C-level scan of the
+    # headline replaces a Python loop of substring tests
+    return re.compile("|".join(map(re.escape, words)))
+
 def now_utc():
     return datetime.now(timezone.utc).strftime("%d %b %Y · %H:%M UTC")
 
@@ -55,16 +216,27 @@ COMMODITY_SYMBOLS = [
     ("UX=F",  "Uranium",         "USD/lb",     "$"),
 ]
 
-# For power/equity prices we use a separate batch call
+# Equity tickers are not quoted yet. When they are, fetch them with a single
+# REALTIME_BULK_QUOTES call (symbol=NEE,XOM,...) rather than GLOBAL_QUOTE per
+# ticker — one request against the daily cap instead of ten. The bulk endpoint
+# needs a premium AV key.
 EQUITY_TICKERS = ["NEE", "XOM", "CVX", "BP", "SHEL", "TTE", "TSLA", "ENPH", "ON", "WOLF"]
 
+# Requests run in parallel; fetch() spaces their network starts per
+# HOST_MIN_INTERVAL to stay under the free key's burst throttle
+AV_MAX_WORKERS = 5
+
+def av_quote_url(sym):
+    return f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={sym}&apikey={AV_KEY}"
+
 def fetch_prices():
     prices = []
 
-    # Commodity quotes via AV global quote
-    for sym, name, unit, prefix in COMMODITY_SYMBOLS:
-        url = f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={sym}&apikey={AV_KEY}"
-        data = fetch_json(url)
+    # Commodity quotes via AV global quote, paced but overlapping round trips
+    with ThreadPoolExecutor(max_workers=AV_MAX_WORKERS) as ex:
+        quotes = list(ex.map(fetch_json, [av_quote_url(c[0]) for c in COMMODITY_SYMBOLS]))
+
+    for (sym, name, unit, prefix), data in zip(COMMODITY_SYMBOLS, quotes):
         if data and "Global Quote" in data and data["Global Quote"].get("05. price"):
             q = data["Global Quote"]
             price = float(q["05. price"])
@@ -76,7 +248,6 @@ def fetch_prices():
                 "change_pct": round(chg_pct, 2),
                 "up": chg_pct >= 0
             })
-            time.sleep(1)  # AV rate limit
         else:
             # Fallback placeholder so dashboard doesn't break
             prices.append({"name": name, "value": "N/A", "unit": unit, "change_pct": 0, "up": True})
@@ -120,22 +291,43 @@ EIA_REGIONS = [
     },
 ]
 
+def eia_demand_url(eia_id):
+    # EIA real-time demand endpoint
+    return (
+        f"https://api.eia.gov/v2/electricity/rto/region-data/data/"
+        f"?api_key={EIA_KEY}"
+        f"&frequency=hourly"
+        f"&data[0]=value"
+        f"&facets[respondent][]={eia_id}"
+        f"&facets[type][]=D"   # D = demand
+        f"&sort[0][column]=period&sort[0][direction]=desc"
+        f"&length=1"
+    )
+
+def eia_mix_url(eia_id):
+    # EIA generation mix endpoint
+    return (
+        f"https://api.eia.gov/v2/electricity/rto/fuel-type-data/data/"
+        f"?api_key={EIA_KEY}"
+        f"&frequency=hourly"
+        f"&data[0]=value"
+        f"&facets[respondent][]={eia_id}"
+        f"&sort[0][column]=period&sort[0][direction]=desc"
+        f"&length=10"
+    )
+
 def fetch_grid_status():
     regions = []
 
-    for r in EIA_REGIONS:
-        # EIA real-time demand endpoint
-        url = (
-            f"https://api.eia.gov/v2/electricity/rto/region-data/data/"
-            f"?api_key={EIA_KEY}"
-            f"&frequency=hourly"
-            f"&data[0]=value"
-            f"&facets[respondent][]={r['eia_id']}"
-            f"&facets[type][]=D"   # D = demand
-            f"&sort[0][column]=period&sort[0][direction]=desc"
-            f"&length=1"
-        )
-        data = fetch_json(url)
+    # Issue demand + mix requests for every region at once
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        pending = [
+            (r, ex.submit(fetch_json, eia_demand_url(r["eia_id"])), ex.submit(fetch_json, eia_mix_url(r["eia_id"])))
+            for r in EIA_REGIONS
+        ]
+
+    for r, demand_req, mix_req in pending:
+        data = demand_req.result()
 
         demand = None
         if data and "response" in data and data["response"].get("data"):
@@ -144,17 +336,7 @@ def fetch_grid_status():
             except:
                 pass
 
-        # Fetch generation mix
-        mix_url = (
-            f"https://api.eia.gov/v2/electricity/rto/fuel-type-data/data/"
-            f"?api_key={EIA_KEY}"
-            f"&frequency=hourly"
-            f"&data[0]=value"
-            f"&facets[respondent][]={r['eia_id']}"
-            f"&sort[0][column]=period&sort[0][direction]=desc"
-            f"&length=10"
-        )
-        mix_data = fetch_json(mix_url)
+        mix_data = mix_req.result()
 
         sources = {}
         if mix_data and "response" in mix_data and mix_data["response"].get("data"):
@@ -202,8 +384,6 @@ def fetch_grid_status():
             "drivers": []  # drivers are contextual — populated by rules below
         })
 
-        time.sleep(0.5)
-
     # Add ENTSO-E Europe as a static fallback (ENTSO-E API requires separate registration)
     regions.append({
         "name": "ENTSO-E (Central EU)",
@@ -242,17 +422,18 @@ COMMENTARY_FEEDS = [
 ]
 
 # Keywords that make an item energy-relevant
-ENERGY_KEYWORDS = [
+ENERGY_KEYWORDS = (
     "energy","power","electricity","grid","solar","wind","nuclear","gas","oil",
     "lng","pipeline","refinery","utility","renewable","hydrogen","carbon","emissions",
     "battery","storage","transmission","capacity","demand","supply","fuel","barrel",
     "megawatt","gigawatt","ferc","eia","opec","iea","petroleum","crude","offshore",
     "ev","electric vehicle","semiconductor","inverter","charging","lithium",
     "tesla","nextera","exxon","shell","bp","chevron","totalenergies",
-]
+)
+ENERGY_RE = keyword_re(ENERGY_KEYWORDS)
 
 # Tag rules — if headline contains keyword, add tag
-TAG_RULES = [
+TAG_RULES = (
     (["usa","u.s.","american","ferc","eia","doe","texas","california","pjm","ercot","miso"],
      {"t":"USA","c":"geo"}),
     (["europe","eu","european","germany","france","uk","britain","norway","entsoe","ofgem"],
@@ -279,87 +460,115 @@ TAG_RULES = [
      {"t":"M&A","c":"pol"}),
     (["policy","regulation","rule","legislation","congress","parliament","directive","mandate"],
      {"t":"Policy","c":"pol"}),
-]
-
-def classify_type(text):
-    t = text.lower()
-    if any(w in t for w in ["acqui","merger","takeover","buys","deal","joint venture"]):
-        return "deal"
-    if any(w in t for w in ["alert","emergency","outage","storm","crisis","shortage","blackout"]):
-        return "alr"
-    if any(w in t for w in ["policy","regulation","rule","law","directive","mandate","congress","parliament"]):
-        return "pol"
-    if any(w in t for w in ["pipeline","plant","project","construction","commission","capacity addition","offshore"]):
-        return "inf"
+)
+
+# Every tag keyword in one pattern, one named group per rule. The lookahead is
+# zero-width, so each position is tried and overlapping keywords are all seen.
+# Only one rule can match per position, so avoid keywords that are a prefix of
+# another rule's keyword.
+TAG_GROUPS = tuple((f"t{i}", tag) for i, (_, tag) in enumerate(TAG_RULES))
+TAG_REGEX = re.compile("(?=" + "|".join(
+    f"(?P<t{i}>{'|'.join(map(re.escape, keywords))})"
+    for i, (keywords, _) in enumerate(TAG_RULES)
+) + ")")
+
+# The rule helpers below take t_lower, a headline that is already lowercased —
+# parse_rss lowers each title once and shares it across all of them.
+
+# Checked in order — the first table with a hit decides the item type
+TYPE_RULES = (
+    ("deal", keyword_re(("acqui","merger","takeover","buys","deal","joint venture"))),
+    ("alr",  keyword_re(("alert","emergency","outage","storm","crisis","shortage","blackout"))),
+    ("pol",  keyword_re(("policy","regulation","rule","law","directive","mandate","congress","parliament"))),
+    ("inf",  keyword_re(("pipeline","plant","project","construction","commission","capacity addition","offshore"))),
+)
+
+def classify_type(t_lower):
+    for item_type, pattern in TYPE_RULES:
+        if pattern.search(t_lower):
+            return item_type
     return "mkt"
 
 TYPE_ICONS = {"pol":"⚖️","mkt":"📊","inf":"🏗️","alr":"⚡","deal":"💰","com":"🏛️"}
 IMP_RULES = {
-    "h": ["emergency","alert","crisis","blackout","outage","shutdown","major","billion","record"],
-    "m": ["deal","acqui","merger","policy","regulation","capacity","project","agreement"],
+    "h": ("emergency","alert","crisis","blackout","outage","shutdown","major","billion","record"),
+    "m": ("deal","acqui","merger","policy","regulation","capacity","project","agreement"),
 }
+IMP_RES = {level: keyword_re(words) for level, words in IMP_RULES.items()}
 
-def calc_impact(text):
-    t = text.lower()
-    if any(w in t for w in IMP_RULES["h"]): return "h"
-    if any(w in t for w in IMP_RULES["m"]): return "m"
+def calc_impact(t_lower):
+    if IMP_RES["h"].search(t_lower): return "h"
+    if IMP_RES["m"].search(t_lower): return "m"
     return "l"
 
-def auto_tag(text, base_tags):
+def auto_tag(t_lower, base_tags):
     tags = list(base_tags)
-    t = text.lower()
     seen = {tg["t"] for tg in tags}
-    for keywords, tag in TAG_RULES:
-        if any(kw in t for kw in keywords) and tag["t"] not in seen:
+    hits = {m.lastgroup for m in TAG_REGEX.finditer(t_lower)}
+    for group, tag in TAG_GROUPS:
+        if group in hits and tag["t"] not in seen:
             tags.append(tag)
             seen.add(tag["t"])
             if len(tags) >= 4:
                 break
     return tags
 
-def is_energy_relevant(text):
-    t = text.lower()
-    return any(kw in t for kw in ENERGY_KEYWORDS)
+def is_energy_relevant(t_lower):
+    return ENERGY_RE.search(t_lower) is not None
+
+# Feeds are fed to the parser in chunks so parse_rss can stop as soon as it
+# has enough items instead of building the whole document
+FEED_CHUNK = 16 * 1024
+
+def iter_rss_items(raw):
+    parser = ET.XMLPullParser(events=("end",))
+    try:
+        for i in range(0, len(raw), FEED_CHUNK):
+            parser.feed(raw[i:i + FEED_CHUNK])
+            for _, elem in parser.read_events():
+                # Match <item> in any namespace or none (RSS 1.0/RDF, default xmlns)
+                if elem.tag == "item" or elem.tag.endswith("}item"):
+                    yield elem
+    except ET.ParseError:
+        # Keep whatever items closed cleanly before the malformed part
+        return
+
+@lru_cache(maxsize=32)
+def fetch_feed(url):
+    # FERC and IEA are in both SIGNAL_FEEDS and COMMENTARY_FEEDS — fetch each
+    # feed once per run. A failed fetch is remembered too, so a dead feed
+    # only costs one timeout.
+    return fetch(url)
 
 def parse_rss(url, base_tags, max_items=4):
-    raw = fetch(url)
+    raw = fetch_feed(url)
     if not raw:
         return []
 
     items = []
-    try:
-        # Strip namespaces for easier parsing
-        raw_clean = re.sub(r'\s+xmlns[^"]*"[^"]*"', '', raw)
-        root = ET.fromstring(raw_clean)
-    except:
-        return []
-
-    channel = root.find("channel")
-    if channel is None:
-        channel = root
-
-    count = 0
-    for item in channel.findall("item"):
-        if count >= max_items:
-            break
-        title_el = item.find("title")
-        pub_el   = item.find("pubDate")
+    for item in iter_rss_items(raw):
+        # Children share the item's namespace ("" for plain RSS 2.0); a {*}
+        # wildcard would also pick up extensions like <dc:title>
+        ns = item.tag[:item.tag.find("}") + 1]
+        title_el = item.find(ns + "title")
+        pub_el   = item.find(ns + "pubDate")
         title = title_el.text.strip() if title_el is not None and title_el.text else ""
         pub   = pub_el.text.strip()   if pub_el   is not None and pub_el.text   else ""
+        item.clear()
 
-        if not title or not is_energy_relevant(title):
+        t_lower = title.lower()
+        if not title or not is_energy_relevant(t_lower):
             continue
 
-        # Format time
+        # Format time — pubDate is RFC 822, with either a zone name or offset
         try:
-            dt = datetime.strptime(pub[:25], "%a, %d %b %Y %H:%M:%S")
-            time_str = dt.strftime("%H:%M\n%d %b")
-        except:
+            time_str = parsedate_to_datetime(pub).strftime("%H:%M\n%d %b")
+        except (TypeError, ValueError):
             time_str = "Recent"
 
-        item_type = classify_type(title)
-        tags      = auto_tag(title, base_tags)
-        impact    = calc_impact(title)
+        item_type = classify_type(t_lower)
+        tags      = auto_tag(t_lower, base_tags)
+        impact    = calc_impact(t_lower)
 
         items.append({
             "time":      time_str,
@@ -370,31 +579,50 @@ def parse_rss(url, base_tags, max_items=4):
             "imp":       impact,
             "type":      item_type,
         })
-        count += 1
+        if len(items) >= max_items:
+            break
 
     return items
 
+ACRONYM_DOT_RE = re.compile(r"(?<=[^\W\d_])\.(?=[^\W\d_])")  # "u.s." → "us."
+PUNCT_RE = re.compile(r"[^\w\s]|_")
+
+def headline_key(head):
+    # Fold case, punctuation and spacing so wire rewrites of one story collide.
+    # Other punctuation becomes a separator, so "$7.5" and "$75" stay distinct.
+    t = ACRONYM_DOT_RE.sub("", head.lower())
+    return " ".join(PUNCT_RE.sub(" ", t).split())
+
+def fetch_signal_feed(feed):
+    url, _, base_tags = feed
+    print(f"  Fetching signals: {url[:50]}...")
+    return parse_rss(url, base_tags)
+
 def fetch_signals():
-    all_items = []
-    for url, dtype, base_tags in SIGNAL_FEEDS:
-        print(f"  Fetching signals: {url[:50]}...")
-        items = parse_rss(url, base_tags)
-        all_items.extend(items)
-        time.sleep(0.5)
-    # Deduplicate by headline
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        results = ex.map(fetch_signal_feed, SIGNAL_FEEDS)
+        all_items = [item for items in results for item in items]
+    # Deduplicate by normalised headline
     seen = set()
     unique = []
     for item in all_items:
-        if item["head"] not in seen:
-            seen.add(item["head"])
+        key = headline_key(item["head"])
+        if key not in seen:
+            seen.add(key)
             unique.append(item)
     return unique[:20]  # cap at 20 items
 
+def fetch_commentary_feed(feed):
+    url, _, source_name = feed
+    print(f"  Fetching commentary: {url[:50]}...")
+    return parse_rss(url, [{"t": source_name, "c": "pol"}], max_items=3)
+
 def fetch_commentary():
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as ex:
+        results = list(ex.map(fetch_commentary_feed, COMMENTARY_FEEDS))
+
     items = []
-    for url, source_type, source_name in COMMENTARY_FEEDS:
-        print(f"  Fetching commentary: {url[:50]}...")
-        raw_items = parse_rss(url, [{"t": source_name, "c": "pol"}], max_items=3)
+    for (_, source_type, source_name), raw_items in zip(COMMENTARY_FEEDS, results):
         for item in raw_items:
             item["type"]   = source_type
             item["icon"]   = "com"
@@ -407,7 +635,6 @@ def fetch_commentary():
                 "pjm":  "PJM Interconnection",
             }.get(source_type, source_name)
         items.extend(raw_items)
-        time.sleep(0.5)
     return items[:12]
 
 # ── 4. EQUITY SUBSECTORS (static until Cap IQ CSV lands) ────────────────────
@@ -467,11 +694,13 @@ def main():
     print(f"  Got {len(output['equity'])} subsectors")
 
     # Write output
+    # Serialise once; indent=2 keeps the committed file's diffs readable
+    payload = json.dumps(output, indent=2)
     os.makedirs("data", exist_ok=True)
     with open("data/live.json", "w") as f:
-        json.dump(output, f, indent=2)
+        f.write(payload)
 
-    print(f"\n✓ data/live.json written — {len(json.dumps(output))} bytes")
+    print(f"\n✓ data/live.json written — {len(payload)} bytes")
     print(f"✓ Done at {now_utc()}\n")
 
 if __name__ == "__main__":